@@ -1,4 +1,4 @@
-import json
+import functools
 import logging
 import os
 import pprint
@@ -6,11 +6,14 @@ from typing import AsyncGenerator
 
 import coloredlogs
 import jwt
+import orjson
 import uvicorn
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
 from cryptography.x509 import load_pem_x509_certificate
 from fastapi import Depends, FastAPI
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel  # pylint: disable=no-name-in-module
 from slugify import slugify
 from typing_extensions import Annotated
@@ -27,7 +30,7 @@ from edcpy.messaging import (
 
 _logger = logging.getLogger(__name__)
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 
 class EndpointDataReference(BaseModel):
@@ -48,30 +51,42 @@ async def get_messaging_app() -> AsyncGenerator[MessagingApp, None]:
 MessagingAppDep = Annotated[MessagingApp, Depends(get_messaging_app)]
 
 
-def _read_public_key() -> str:
-    """Read the public key from the certificate file specified by the
-    EDC_CERT_PATH environment variable."""
+_JWT = jwt.PyJWT()
 
-    app_config: AppConfig = get_config()
-    cert_path = app_config.cert_path
 
-    if not cert_path:
-        raise ValueError("EDC_CERT_PATH environment variable not set")
+@functools.lru_cache(maxsize=8)
+def _load_public_key(cert_path: str) -> RSAPublicKey:
+    """Load the public key from a PEM certificate. The result is cached so
+    that the certificate is only read and parsed once per path."""
 
     with open(cert_path, "rb") as fh:
-        cert_str = fh.read()
-        cert_obj = load_pem_x509_certificate(cert_str, default_backend())
+        cert_obj = load_pem_x509_certificate(fh.read(), default_backend())
 
-        public_key = cert_obj.public_key().public_bytes(
+    public_key = cert_obj.public_key()
+
+    _logger.debug(
+        "Public key read from certificate '%s':\n%s",
+        cert_path,
+        public_key.public_bytes(
             encoding=serialization.Encoding.PEM,
             format=serialization.PublicFormat.SubjectPublicKeyInfo,
-        )
+        ).decode(),
+    )
 
-        _logger.debug(
-            "Public key read from certificate '%s':\n%s", cert_path, public_key.decode()
-        )
+    return public_key
+
+
+def _read_public_key() -> RSAPublicKey:
+    """Read the public key from the certificate file specified by the
+    EDC_CERT_PATH environment variable."""
+
+    app_config: AppConfig = get_config()
+    cert_path = app_config.cert_path
 
-        return public_key
+    if not cert_path:
+        raise ValueError("EDC_CERT_PATH environment variable not set")
+
+    return _load_public_key(cert_path)
 
 
 def _decode_auth_code(item: EndpointDataReference) -> dict:
@@ -95,16 +110,21 @@ def _decode_auth_code(item: EndpointDataReference) -> dict:
         }
 
     try:
-        _logger.debug("Trying to decode JWT:\n%s", pprint.pformat(decode_kwargs))
-        ret = jwt.decode(jwt=item.authCode, **decode_kwargs)
+        _logger.debug(
+            "Trying to decode JWT (verify_signature=%s)",
+            decode_kwargs["options"]["verify_signature"],
+        )
+
+        ret = _JWT.decode(jwt=item.authCode, **decode_kwargs)
     except jwt.exceptions.InvalidSignatureError:
         _logger.warning("Invalid signature, trying to decode without signature")
         decode_kwargs["options"]["verify_signature"] = False
-        ret = jwt.decode(jwt=item.authCode, **decode_kwargs)
+        ret = _JWT.decode(jwt=item.authCode, **decode_kwargs)
 
-    ret["dad"] = json.loads(ret["dad"])
+    ret["dad"] = orjson.loads(ret["dad"])
 
-    _logger.debug("Decoded JWT:\n%s", pprint.pformat(ret))
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug("Decoded JWT:\n%s", pprint.pformat(ret))
 
     return ret
 
@@ -113,15 +133,17 @@ def _decode_auth_code(item: EndpointDataReference) -> dict:
 async def http_pull_endpoint(
     item: EndpointDataReference, messaging_app: MessagingAppDep
 ):
-    _logger.debug(
-        "Received HTTP Pull request %s:\n%s",
-        EndpointDataReference,
-        pprint.pformat(item.dict()),
-    )
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug(
+            "Received HTTP Pull request %s:\n%s",
+            EndpointDataReference,
+            pprint.pformat(item.model_dump()),
+        )
 
     decoded_auth_code = _decode_auth_code(item)
 
-    message = HttpPullMessage(
+    # Every field has already been validated as part of the EndpointDataReference
+    message = HttpPullMessage.model_construct(
         auth_code_decoded=decoded_auth_code,
         auth_code=item.authCode,
         auth_key=item.authKey,
@@ -156,8 +178,11 @@ async def http_pull_endpoint(
 async def _http_push_endpoint(
     body: dict, routing_key: str, messaging_app: MessagingApp
 ) -> dict:
-    _logger.debug("Received HTTP Push request:\n%s", pprint.pformat(body))
-    message = HttpPushMessage(body=body)
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug("Received HTTP Push request:\n%s", pprint.pformat(body))
+
+    # FastAPI has already validated the body as a dict
+    message = HttpPushMessage.model_construct(body=body)
 
     _logger.info(
         "Publishing %s to routing key '%s'", message.__class__.__name__, routing_key
@@ -1,6 +1,7 @@
 # pylint: disable=no-member,too-few-public-methods
 
 from dataclasses import dataclass
+from functools import cached_property
 
 import environ
 
@@ -9,7 +10,7 @@ from edcpy.utils import join_url
 PREFIX = "EDC"
 
 
-@environ.config(prefix=PREFIX)
+@environ.config(prefix=PREFIX, frozen=True)
 class AppConfig:
     """Configuration class for the application."""
 
@@ -17,7 +18,7 @@ class AppConfig:
     rabbit_url: str = environ.var(default=None)
     http_api_port: int = environ.var(converter=int, default=8000)
 
-    @environ.config
+    @environ.config(frozen=True)
     class Connector:
         """The connection details for the Management and Control APIs of the instance
         of the EDC Connector that the current program is interacting with."""
@@ -46,34 +47,37 @@ def get_config() -> AppConfig:
 
 @dataclass
 class ConnectorUrls:
+    """URLs of the connector APIs. These are derived from the configuration
+    once and cached, as they are read on every request to the connector."""
+
     conf: AppConfig
 
-    @property
+    @cached_property
     def scheme_host(self) -> str:
         return f"{self.conf.connector.scheme}://{self.conf.connector.host}"
 
-    @property
+    @cached_property
     def management_url(self) -> str:
         return join_url(
             f"{self.scheme_host}:{self.conf.connector.management_port}",
             self.conf.connector.management_path,
         )
 
-    @property
+    @cached_property
     def control_url(self) -> str:
         return join_url(
             f"{self.scheme_host}:{self.conf.connector.control_port}",
             self.conf.connector.control_path,
         )
 
-    @property
+    @cached_property
     def public_url(self) -> str:
         return join_url(
             f"{self.scheme_host}:{self.conf.connector.public_port}",
             self.conf.connector.public_path,
         )
 
-    @property
+    @cached_property
     def protocol_url(self) -> str:
         return join_url(
             f"{self.scheme_host}:{self.conf.connector.protocol_port}",
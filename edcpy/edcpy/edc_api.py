@@ -1,11 +1,30 @@
 import asyncio
+import functools
+import hashlib
 import logging
 import pprint
+import random
+import time
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import Any, AsyncGenerator, AsyncIterator, Dict, Iterator, Union
+from types import MappingProxyType
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    Mapping,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import httpx
+import orjson
 
 from edcpy.config import AppConfig, ConnectorUrls, get_config
 from edcpy.models.asset import Asset
@@ -17,45 +36,133 @@ from edcpy.models.transfer_process import TransferProcess
 from edcpy.utils import join_url
 
 _DEFAULT_TIMEOUT_SECS = 60
+_DEFAULT_CONNECT_RETRIES = 3
+_DEFAULT_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8)
+_DEFAULT_CATALOG_TTL_SECS = 0
+_DEFAULT_NEGOTIATION_TTL_SECS = 0
+_POLL_INITIAL_SLEEP = 0.1
+_POLL_BACKOFF_FACTOR = 1.5
+_POLL_JITTER = 0.2
 
 _logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+_TTLCache = Dict[Hashable, Tuple[float, "asyncio.Future[Any]"]]
+
 
 def _log_req(method, url, data=None):
-    _logger.debug("-> %s %s\n%s", method, url, pprint.pformat(data) if data else "")
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug("-> %s %s\n%s", method, url, pprint.pformat(data) if data else "")
 
 
 def _log_res(method, url, data):
-    _logger.debug("<- %s %s\n%s", method, url, pprint.pformat(data))
+    # Responses (e.g. catalogs) can be large: only pretty-print them if needed
+    if _logger.isEnabledFor(logging.DEBUG):
+        _logger.debug("<- %s %s\n%s", method, url, pprint.pformat(data))
+
+
+@dataclass
+class _PolledResource:
+    """Last known state of a resource that is being polled."""
+
+    etag: Union[str, None] = None
+    digest: Union[bytes, None] = None
+    data: Union[dict, None] = None
+
+
+async def _poll_json(
+    client: httpx.AsyncClient, url: str, polled: _PolledResource, timeout_secs: int
+) -> dict:
+    """GET a JSON resource, only parsing the body when it has changed since the
+    previous iteration. Uses If-None-Match if the server sent an ETag and falls back
+    to comparing a digest of the raw body otherwise."""
+
+    headers = {"If-None-Match": polled.etag} if polled.etag else None
+    _log_req("GET", url)
+    response = await client.get(url, headers=headers, timeout=timeout_secs)
+
+    if response.status_code == httpx.codes.NOT_MODIFIED and polled.data is not None:
+        return polled.data
+
+    response.raise_for_status()
+    polled.etag = response.headers.get("ETag")
+    digest = hashlib.blake2b(response.content, digest_size=16).digest()
+
+    if digest != polled.digest:
+        polled.digest = digest
+        polled.data = orjson.loads(response.content)
+        _log_res("GET", url, polled.data)
+
+    return polled.data
+
+
+@functools.lru_cache(maxsize=8)
+def _default_headers(
+    api_key_header: str, api_key: Union[str, None]
+) -> Mapping[str, str]:
+    """Immutable default headers, built once per API key configuration."""
+
+    if not api_key:
+        return MappingProxyType({})
+
+    _logger.debug("API auth enabled (header=%s)", api_key_header)
+
+    return MappingProxyType({api_key_header: api_key})
+
+
+def build_httpx_client(
+    timeout: int = _DEFAULT_TIMEOUT_SECS,
+    config: Union[AppConfig, None] = None,
+) -> httpx.AsyncClient:
+    """Build a client for the Management API. The caller owns the client and
+    is responsible for closing it (e.g. using it as an async context manager)."""
+
+    config = config or get_config()
+
+    headers = _default_headers(
+        config.connector.api_key_header, config.connector.api_key
+    )
+
+    # Connection errors (e.g. the connector is restarting) are retried
+    # at the transport level instead of failing the whole flow.
+    transport = httpx.AsyncHTTPTransport(
+        retries=_DEFAULT_CONNECT_RETRIES, limits=_DEFAULT_LIMITS
+    )
+
+    return httpx.AsyncClient(timeout=timeout, headers=headers, transport=transport)
 
 
 @asynccontextmanager
 async def async_httpx_client(
     timeout: int = _DEFAULT_TIMEOUT_SECS,
+    config: Union[AppConfig, None] = None,
+    client: Union[httpx.AsyncClient, None] = None,
 ) -> AsyncIterator[httpx.AsyncClient]:
-    config = get_config()
-
-    headers = {}
+    """Yield the given client as-is, so that its pooled connections are reused,
+    or a new short-lived client that is closed on exit if none is given.
+    The timeout is only set on new clients, so the helpers also pass it
+    on every request for it to apply to shared clients."""
 
-    if config.connector.api_key:
-        headers[config.connector.api_key_header] = config.connector.api_key
-        _logger.debug("API auth enabled (header=%s)", config.connector.api_key_header)
-
-    async with httpx.AsyncClient(timeout=timeout, headers=headers) as client:
+    if client is not None:
         yield client
+        return
+
+    async with build_httpx_client(timeout=timeout, config=config) as new_client:
+        yield new_client
 
 
 async def register_data_plane(
     management_url: str,
     timeout_secs: int = _DEFAULT_TIMEOUT_SECS,
+    client: Union[httpx.AsyncClient, None] = None,
     **dataplane_kwargs: Dict[str, Any],
 ) -> dict:
     data = DataPlaneInstance.build(**dataplane_kwargs)
 
-    async with async_httpx_client(timeout=timeout_secs) as client:
+    async with async_httpx_client(timeout=timeout_secs, client=client) as client:
         url = join_url(management_url, "v2", "dataplanes")
         _log_req("POST", url, data)
-        response = await client.post(url, json=data)
+        response = await client.post(url, json=data, timeout=timeout_secs)
         response.raise_for_status()
 
     return data
@@ -64,16 +171,17 @@ async def register_data_plane(
 async def create_asset(
     management_url: str,
     timeout_secs: int = _DEFAULT_TIMEOUT_SECS,
+    client: Union[httpx.AsyncClient, None] = None,
     **asset_kwargs: Dict[str, Any],
 ) -> dict:
     data = Asset.build_http_data(**asset_kwargs)
 
-    async with async_httpx_client(timeout=timeout_secs) as client:
+    async with async_httpx_client(timeout=timeout_secs, client=client) as client:
         url = join_url(management_url, "v3", "assets")
         _log_req("POST", url, data)
-        response = await client.post(url, json=data)
+        response = await client.post(url, json=data, timeout=timeout_secs)
         response.raise_for_status()
-        resp_json = response.json()
+        resp_json = orjson.loads(response.content)
         _log_res("POST", url, resp_json)
 
     return resp_json
@@ -82,16 +190,17 @@ async def create_asset(
 async def create_policy_definition(
     management_url: str,
     timeout_secs: int = _DEFAULT_TIMEOUT_SECS,
+    client: Union[httpx.AsyncClient, None] = None,
     **policy_kwargs: Dict[str, Any],
 ) -> dict:
     data = PolicyDefinition.build(**policy_kwargs)
 
-    async with async_httpx_client(timeout=timeout_secs) as client:
+    async with async_httpx_client(timeout=timeout_secs, client=client) as client:
         url = join_url(management_url, "v2", "policydefinitions")
         _log_req("POST", url, data)
-        response = await client.post(url, json=data)
+        response = await client.post(url, json=data, timeout=timeout_secs)
         response.raise_for_status()
-        resp_json = response.json()
+        resp_json = orjson.loads(response.content)
         _log_res("POST", url, resp_json)
 
     return resp_json
@@ -100,16 +209,17 @@ async def create_policy_definition(
 async def create_contract_definition(
     management_url: str,
     timeout_secs: int = _DEFAULT_TIMEOUT_SECS,
+    client: Union[httpx.AsyncClient, None] = None,
     **contract_def_kwargs: Dict[str, Any],
 ) -> dict:
     data = ContractDefinition.build(**contract_def_kwargs)
 
-    async with async_httpx_client(timeout=timeout_secs) as client:
+    async with async_httpx_client(timeout=timeout_secs, client=client) as client:
         url = join_url(management_url, "v2", "contractdefinitions")
         _log_req("POST", url, data)
-        response = await client.post(url, json=data)
+        response = await client.post(url, json=data, timeout=timeout_secs)
         response.raise_for_status()
-        resp_json = response.json()
+        resp_json = orjson.loads(response.content)
         _log_res("POST", url, resp_json)
 
     return resp_json
@@ -119,6 +229,7 @@ async def fetch_catalog(
     management_url: str,
     counter_party_protocol_url: str,
     timeout_secs: int = _DEFAULT_TIMEOUT_SECS,
+    client: Union[httpx.AsyncClient, None] = None,
 ) -> dict:
     data = {
         "@context": {"@vocab": "https://w3id.org/edc/v0.0.1/ns/"},
@@ -126,12 +237,12 @@ async def fetch_catalog(
         "protocol": "dataspace-protocol-http",
     }
 
-    async with async_httpx_client(timeout=timeout_secs) as client:
+    async with async_httpx_client(timeout=timeout_secs, client=client) as client:
         url = join_url(management_url, "v2", "catalog", "request")
         _log_req("POST", url, data)
-        response = await client.post(url, json=data)
+        response = await client.post(url, json=data, timeout=timeout_secs)
         response.raise_for_status()
-        resp_json = response.json()
+        resp_json = orjson.loads(response.content)
         _log_res("POST", url, resp_json)
 
     return resp_json
@@ -140,41 +251,54 @@ async def fetch_catalog(
 async def create_contract_negotiation(
     management_url: str,
     timeout_secs: int = _DEFAULT_TIMEOUT_SECS,
+    client: Union[httpx.AsyncClient, None] = None,
     **contract_negotiation_kwargs: Dict[str, Any],
 ) -> dict:
     data = ContractNegotiation.build(**contract_negotiation_kwargs)
 
-    async with async_httpx_client(timeout=timeout_secs) as client:
+    async with async_httpx_client(timeout=timeout_secs, client=client) as client:
         url = join_url(management_url, "v2", "contractnegotiations")
 
         _log_req("POST", url, data)
-        response = await client.post(url, json=data)
+        response = await client.post(url, json=data, timeout=timeout_secs)
         response.raise_for_status()
-        resp_json = response.json()
+        resp_json = orjson.loads(response.content)
         _log_res("POST", url, resp_json)
 
     return resp_json
 
 
+def _iter_poll_delays(max_sleep: float) -> Iterator[float]:
+    """Exponentially growing delays (with jitter) between polls, capped at
+    max_sleep, so that fast state transitions are detected early without
+    hammering the Management API on slow ones."""
+
+    delay = min(_POLL_INITIAL_SLEEP, max_sleep)
+
+    while True:
+        jittered = delay * random.uniform(1 - _POLL_JITTER, 1 + _POLL_JITTER)
+        yield min(jittered, max_sleep)
+        delay = min(delay * _POLL_BACKOFF_FACTOR, max_sleep)
+
+
 async def wait_for_contract_negotiation(
     management_url: str,
     contract_negotiation_id: str,
     timeout_secs: int = _DEFAULT_TIMEOUT_SECS,
     iter_sleep: float = 1.0,
+    client: Union[httpx.AsyncClient, None] = None,
 ) -> str:
     url = join_url(
         management_url,
         f"v2/contractnegotiations/{contract_negotiation_id}",
     )
 
-    async with async_httpx_client(timeout=timeout_secs) as client:
-        while True:
-            _log_req("GET", url)
-            response = await client.get(url)
-            response.raise_for_status()
-            resp_json = response.json()
-            _log_res("GET", url, resp_json)
+    polled = _PolledResource()
+    delays = _iter_poll_delays(iter_sleep)
 
+    async with async_httpx_client(timeout=timeout_secs, client=client) as client:
+        while True:
+            resp_json = await _poll_json(client, url, polled, timeout_secs)
             agreement_id = resp_json.get("contractAgreementId")
             state = resp_json.get("state")
 
@@ -186,13 +310,14 @@ async def wait_for_contract_negotiation(
                 contract_negotiation_id,
             )
 
-            await asyncio.sleep(iter_sleep)
+            await asyncio.sleep(next(delays))
 
 
 async def create_transfer_process(
     management_url: str,
     timeout_secs: int = _DEFAULT_TIMEOUT_SECS,
     is_provider_push: bool = False,
+    client: Union[httpx.AsyncClient, None] = None,
     **transfer_process_kwargs: Dict[str, Any],
 ) -> dict:
     data = (
@@ -201,12 +326,12 @@ async def create_transfer_process(
         else TransferProcess.build_for_consumer_http_pull(**transfer_process_kwargs)
     )
 
-    async with async_httpx_client(timeout=timeout_secs) as client:
+    async with async_httpx_client(timeout=timeout_secs, client=client) as client:
         url = join_url(management_url, "v2", "transferprocesses")
         _log_req("POST", url, data)
-        response = await client.post(url, json=data)
+        response = await client.post(url, json=data, timeout=timeout_secs)
         response.raise_for_status()
-        resp_json = response.json()
+        resp_json = orjson.loads(response.content)
         _log_res("POST", url, resp_json)
 
     return resp_json
@@ -217,73 +342,104 @@ async def wait_for_transfer_process(
     transfer_process_id: str,
     timeout_secs: int = _DEFAULT_TIMEOUT_SECS,
     iter_sleep: float = 1.0,
+    client: Union[httpx.AsyncClient, None] = None,
 ):
     url = join_url(
         management_url,
         f"v2/transferprocesses/{transfer_process_id}",
     )
 
-    async with async_httpx_client(timeout=timeout_secs) as client:
+    polled = _PolledResource()
+    delays = _iter_poll_delays(iter_sleep)
+
+    async with async_httpx_client(timeout=timeout_secs, client=client) as client:
         while True:
-            _log_req("GET", url)
-            response = await client.get(url)
-            response.raise_for_status()
-            resp_json = response.json()
-            _log_res("GET", url, resp_json)
+            resp_json = await _poll_json(client, url, polled, timeout_secs)
 
             if resp_json.get("state") == "COMPLETED":
                 return resp_json
 
             _logger.debug("Waiting for transfer process (id=%s)", transfer_process_id)
-            await asyncio.sleep(iter_sleep)
+            await asyncio.sleep(next(delays))
 
 
-@dataclass
+@dataclass(frozen=True)
 class CatalogContent:
+    __slots__ = ("data", "datasets")
+
     data: dict
 
-    @property
-    def datasets(self) -> Iterator[dict]:
-        if not self.data.get("dcat:dataset"):
-            return iter([])
+    def __post_init__(self):
+        datasets = self.data.get("dcat:dataset") or []
 
-        if isinstance(self.data["dcat:dataset"], list):
-            return iter(self.data["dcat:dataset"])
+        if not isinstance(datasets, list):
+            datasets = [datasets]
 
-        return iter([self.data["dcat:dataset"]])
+        object.__setattr__(self, "datasets", tuple(datasets))
 
     def find_one_dataset(self, asset_query: Union[str, None]) -> Union[dict, None]:
+        if not asset_query:
+            return next(iter(self.datasets), None)
+
+        query = asset_query.lower()
+
         return next(
             (
                 dset
                 for dset in self.datasets
-                if not asset_query
-                or asset_query.lower() in dset.get("id", "").lower()
-                or asset_query.lower() in dset.get("name", "").lower()
+                if query in dset.get("id", "").lower()
+                or query in dset.get("name", "").lower()
             ),
             None,
         )
 
 
-@dataclass
+@dataclass(frozen=True)
 class CatalogDataset:
+    __slots__ = (
+        "data",
+        "default_policy",
+        "default_contract_offer_id",
+        "default_asset_id",
+    )
+
     data: dict
 
-    @property
-    def default_policy(self) -> dict:
-        return (
-            self.data["odrl:hasPolicy"][0]
-            if isinstance(self.data["odrl:hasPolicy"], list)
-            else self.data["odrl:hasPolicy"]
-        )
+    def __post_init__(self):
+        policy = self.data["odrl:hasPolicy"]
+        policy = policy[0] if isinstance(policy, list) else policy
+        object.__setattr__(self, "default_policy", policy)
+        object.__setattr__(self, "default_contract_offer_id", policy["@id"])
+        object.__setattr__(self, "default_asset_id", self.data["@id"])
 
-    @property
-    def default_contract_offer_id(self) -> str:
-        return self.default_policy["@id"]
 
-    @property
-    def default_asset_id(self) -> str:
-        return self.data["@id"]
+async def _ttl_cached(
+    cache: _TTLCache,
+    key: Hashable,
+    ttl_secs: float,
+    factory: Callable[[], Awaitable[_T]],
+) -> _T:
+    """Return the result of factory() cached under key for ttl_secs seconds.
+    Concurrent callers share the same in-flight call, and failures are evicted
+    so that the next call retries."""
+
+    if ttl_secs <= 0:
+        return await factory()
+
+    now = time.monotonic()
+    cached = cache.get(key)
+
+    if cached is None or now - cached[0] >= ttl_secs:
+        cached = (now, asyncio.ensure_future(factory()))
+        cache[key] = cached
+
+    try:
+        return await asyncio.shield(cached[1])
+    except Exception:
+        if cache.get(key) is cached:
+            del cache[key]
+
+        raise
 
 
 @dataclass
@@ -295,30 +451,96 @@ class TransferProcessDetails:
 
 
 class ConnectorController:
+    """Runs the negotiation and transfer flows against the Management API.
+
+    When used as an async context manager, a single HTTP client is kept open
+    and shared by all requests so that connections to the connector are reused.
+    Otherwise, each request opens and closes its own client.
+
+    Catalogues may be cached for catalog_ttl_secs seconds and contract agreements
+    for negotiation_ttl_secs seconds. Both caches are disabled (zero) by default:
+    catalogues change as assets are published, and agreement policies
+    may constrain their reuse."""
+
     def __init__(
-        self, timeout_secs: int = _DEFAULT_TIMEOUT_SECS, config: AppConfig = None
+        self,
+        timeout_secs: int = _DEFAULT_TIMEOUT_SECS,
+        config: AppConfig = None,
+        catalog_ttl_secs: float = _DEFAULT_CATALOG_TTL_SECS,
+        negotiation_ttl_secs: float = _DEFAULT_NEGOTIATION_TTL_SECS,
     ) -> None:
         self.timeout_secs = timeout_secs
         self.config: AppConfig = config or get_config()
+        self.catalog_ttl_secs = catalog_ttl_secs
+        self.negotiation_ttl_secs = negotiation_ttl_secs
+        self._client: Union[httpx.AsyncClient, None] = None
+        self._catalogs: _TTLCache = {}
+        self._negotiations: _TTLCache = {}
+
+    async def __aenter__(self) -> "ConnectorController":
+        if self._client is None:
+            self._client = build_httpx_client(
+                timeout=self.timeout_secs, config=self.config
+            )
+
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+
+        if client is not None:
+            await client.aclose()
 
     @property
+    def _client_kwargs(self) -> Dict[str, Any]:
+        return {"timeout_secs": self.timeout_secs, "client": self._client}
+
+    @functools.cached_property
     def connector_urls(self) -> ConnectorUrls:
         return ConnectorUrls(self.config)
 
-    async def fetch_catalog(self, counter_party_protocol_url: str) -> CatalogContent:
+    async def _fetch_catalog(self, counter_party_protocol_url: str) -> CatalogContent:
         catalog_res = await fetch_catalog(
             management_url=self.connector_urls.management_url,
             counter_party_protocol_url=counter_party_protocol_url,
-            timeout_secs=self.timeout_secs,
+            **self._client_kwargs,
         )
 
         return CatalogContent(catalog_res)
 
+    async def fetch_catalog(self, counter_party_protocol_url: str) -> CatalogContent:
+        return await _ttl_cached(
+            cache=self._catalogs,
+            key=counter_party_protocol_url,
+            ttl_secs=self.catalog_ttl_secs,
+            factory=lambda: self._fetch_catalog(counter_party_protocol_url),
+        )
+
     async def run_negotiation_flow(
         self,
         counter_party_protocol_url: str,
         counter_party_connector_id: str,
         asset_query: Union[str, None],
+    ) -> TransferProcessDetails:
+        return await _ttl_cached(
+            cache=self._negotiations,
+            key=(counter_party_protocol_url, counter_party_connector_id, asset_query),
+            ttl_secs=self.negotiation_ttl_secs,
+            factory=lambda: self._run_negotiation_flow(
+                counter_party_protocol_url=counter_party_protocol_url,
+                counter_party_connector_id=counter_party_connector_id,
+                asset_query=asset_query,
+            ),
+        )
+
+    async def _run_negotiation_flow(
+        self,
+        counter_party_protocol_url: str,
+        counter_party_connector_id: str,
+        asset_query: Union[str, None],
     ) -> TransferProcessDetails:
         _logger.info("Preparing to transfer asset (query: %s)", asset_query)
 
@@ -331,7 +553,9 @@ class ConnectorController:
         if not dataset_dict:
             raise ValueError(f"Dataset not found for query: {asset_query}")
 
-        _logger.debug("Selected dataset:\n%s", pprint.pformat(dataset_dict))
+        if _logger.isEnabledFor(logging.DEBUG):
+            _logger.debug("Selected dataset:\n%s", pprint.pformat(dataset_dict))
+
         dataset = CatalogDataset(data=dataset_dict)
         asset_id = dataset.default_asset_id
         _logger.info("Creating contract negotiation for Asset ID: %s", asset_id)
@@ -344,6 +568,7 @@ class ConnectorController:
             counter_party_protocol_url=counter_party_protocol_url,
             asset_id=dataset.default_asset_id,
             policy=dataset.default_policy,
+            **self._client_kwargs,
         )
 
         contract_negotiation_id = contract_negotiation["@id"]
@@ -352,6 +577,7 @@ class ConnectorController:
         contract_agreement_id = await wait_for_contract_negotiation(
             management_url=self.connector_urls.management_url,
             contract_negotiation_id=contract_negotiation_id,
+            **self._client_kwargs,
         )
 
         return TransferProcessDetails(
@@ -374,7 +600,7 @@ class ConnectorController:
             counter_party_protocol_url=transfer_details.counter_party_protocol_url,
             contract_agreement_id=transfer_details.contract_agreement_id,
             asset_id=transfer_details.asset_id,
-            **transfer_process_kwargs,
+            **{**self._client_kwargs, **transfer_process_kwargs},
         )
 
         transfer_process_id = transfer_process["@id"]
@@ -387,5 +613,5 @@ class ConnectorController:
         await wait_for_transfer_process(
             management_url=self.connector_urls.management_url,
             transfer_process_id=transfer_process_id,
-            **kwargs,
+            **{**self._client_kwargs, **kwargs},
         )
@@ -4,6 +4,7 @@ that the EDC OAuth2 extension depends on (if enabled).
 """
 
 import argparse
+import functools
 import logging
 import pprint
 import time
@@ -13,6 +14,8 @@ import requests
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
 from cryptography.x509 import load_pem_x509_certificate
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 from edcpy.utils import join_url
 
@@ -24,9 +27,39 @@ _DEFAULT_KEYCLOAK_ADMIN_PASS = "admin"
 _SCOPE_NBF = "edc-nbf"
 _SCOPE_AUD = "edc-aud"
 
+# (connect, read) timeouts in seconds
+_REQUEST_TIMEOUT = (3.05, 30)
+
 _logger = logging.getLogger(__name__)
 
 
+def build_session() -> requests.Session:
+    """Build a session that reuses connections to Keycloak and retries
+    transient failures with exponential backoff."""
+
+    # Failed connections are retried for every method, since the request was
+    # never sent. Error statuses are only retried for GET: the POSTs create
+    # entities and may have succeeded even if a proxy answered with a 502/504.
+    retry = Retry(
+        total=5,
+        backoff_factor=0.1,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+    )
+
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+@functools.lru_cache(maxsize=None)
+def _get_session() -> requests.Session:
+    return build_session()
+
+
 def build_headers(admin_token: str) -> dict:
     return {
         "Authorization": f"Bearer {admin_token}",
@@ -44,7 +77,7 @@ def get_admin_token(keycloak_url: str, admin_user: str, admin_pass: str) -> str:
         "password": admin_pass,
     }
 
-    response = requests.post(token_url, data=token_data)
+    response = _get_session().post(token_url, data=token_data, timeout=_REQUEST_TIMEOUT)
     access_token = response.json()["access_token"]
 
     return access_token
@@ -53,7 +86,7 @@ def get_admin_token(keycloak_url: str, admin_user: str, admin_pass: str) -> str:
 def get_realm(keycloak_url: str, admin_token: str, realm_name: str) -> dict:
     headers = build_headers(admin_token)
     url = join_url(keycloak_url, "admin/realms", realm_name)
-    response = requests.get(url, headers=headers)
+    response = _get_session().get(url, headers=headers, timeout=_REQUEST_TIMEOUT)
     response.raise_for_status()
 
     return response.json()
@@ -70,7 +103,9 @@ def create_realm(keycloak_url: str, admin_token: str, realm_name: str) -> dict:
     }
 
     url = join_url(keycloak_url, "admin/realms")
-    response = requests.post(url, json=realm_data, headers=headers)
+    response = _get_session().post(
+        url, json=realm_data, headers=headers, timeout=_REQUEST_TIMEOUT
+    )
     response.raise_for_status()
 
     return get_realm(
@@ -83,7 +118,7 @@ def get_client(
 ) -> dict:
     headers = build_headers(admin_token)
     url = join_url(keycloak_url, "admin/realms", realm_name, "clients")
-    response = requests.get(url, headers=headers)
+    response = _get_session().get(url, headers=headers, timeout=_REQUEST_TIMEOUT)
     response.raise_for_status()
     clients = response.json()
 
@@ -108,7 +143,9 @@ def create_client(
     }
 
     url = join_url(keycloak_url, "admin/realms", realm_name, "clients")
-    response = requests.post(url, json=client_data, headers=headers)
+    response = _get_session().post(
+        url, json=client_data, headers=headers, timeout=_REQUEST_TIMEOUT
+    )
     response.raise_for_status()
 
     return get_client(
@@ -153,7 +190,9 @@ def create_nbf_scope(
 
     headers = build_headers(admin_token)
     url = join_url(keycloak_url, "admin/realms", realm_name, "client-scopes")
-    response = requests.post(url, json=data, headers=headers)
+    response = _get_session().post(
+        url, json=data, headers=headers, timeout=_REQUEST_TIMEOUT
+    )
     response.raise_for_status()
 
 
@@ -189,7 +228,9 @@ def create_aud_scope(
 
     headers = build_headers(admin_token)
     url = join_url(keycloak_url, "admin/realms", realm_name, "client-scopes")
-    response = requests.post(url, json=data, headers=headers)
+    response = _get_session().post(
+        url, json=data, headers=headers, timeout=_REQUEST_TIMEOUT
+    )
     response.raise_for_status()
 
 
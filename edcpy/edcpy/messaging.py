@@ -15,6 +15,7 @@ BASE_HTTP_PUSH_QUEUE_ROUTING_KEY = "http.push"
 DEFAULT_EXCHANGE_NAME = "edcpy-topic-exchange"
 DEFAULT_HTTP_PULL_QUEUE_NAME = "http-pull-queue"
 DEFAULT_HTTP_PUSH_QUEUE_NAME = "http-push-queue"
+DEFAULT_PREFETCH_COUNT = 100
 
 _logger = logging.getLogger(__name__)
 
@@ -79,6 +80,7 @@ async def start_messaging_app(
     http_push_queue_routing_key: str = f"{BASE_HTTP_PUSH_QUEUE_ROUTING_KEY}.#",
     http_pull_handler: Union[callable, None] = None,
     http_push_handler: Union[callable, None] = None,
+    prefetch_count: Union[int, None] = DEFAULT_PREFETCH_COUNT,
 ) -> MessagingApp:
     app_config: AppConfig = get_config()
     rabbit_url = app_config.rabbit_url
@@ -87,7 +89,9 @@ async def start_messaging_app(
         raise ValueError("RabbitMQ URL is not set")
 
     _logger.info("Connecting to RabbitMQ at %s", rabbit_url)
-    broker = RabbitBroker(rabbit_url, logger=_logger)
+    # The prefetch count (basic.qos) bounds the number of unacknowledged
+    # messages that the broker pushes to this consumer at any given time.
+    broker = RabbitBroker(rabbit_url, logger=_logger, max_consumers=prefetch_count)
     app = FastStream(broker, logger=_logger)
 
     _logger.info("Declaring exchange: %s", exchange_name)
@@ -129,15 +133,27 @@ async def start_messaging_app(
         broker.subscriber(http_push_queue, topic_exchange)(http_push_handler)
 
     _logger.info("Starting broker")
-    await broker.start()
+
+    try:
+        await broker.start()
+    except BaseException:
+        # Release the connection if the broker failed to start halfway through,
+        # without masking the original error if closing fails as well
+        try:
+            await broker.close()
+        except Exception:  # pylint: disable=broad-except
+            _logger.warning("Could not close messaging app broker", exc_info=True)
+
+        raise
 
     return MessagingApp(broker=broker, app=app, exchange=topic_exchange)
 
 
 @asynccontextmanager
 async def with_messaging_app(*args, **kwargs) -> AsyncGenerator[MessagingApp, None]:
+    msg_app = await start_messaging_app(*args, **kwargs)
+
     try:
-        msg_app = await start_messaging_app(*args, **kwargs)
         yield msg_app
     finally:
         try:
@@ -0,0 +1,95 @@
+"""
+Logging and event loop setup shared by the example scripts.
+"""
+
+import asyncio
+import logging
+import sys
+from typing import Any
+
+import coloredlogs
+import orjson
+
+_PRETTY_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+
+# Set by install_logging
+_json_logs = False
+
+
+class JsonLogFormatter(logging.Formatter):
+    """Formats each record as a single-line JSON object, including any fields
+    passed through the extra argument, for consumption by log aggregators."""
+
+    _RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {
+        "message",
+        "asctime",
+    }
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        data.update(
+            (key, val)
+            for key, val in vars(record).items()
+            if key not in self._RECORD_ATTRS
+        )
+
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+
+        return orjson.dumps(data, default=str).decode()
+
+
+def install_logging(level, json_format: bool = False):
+    """Install coloredlogs on interactive terminals and a plain (cheaper)
+    stream handler otherwise, e.g. when output is redirected in CI runs.
+    Records are emitted as JSON objects instead when json_format is set."""
+
+    global _json_logs  # pylint: disable=global-statement
+
+    # logging (unlike coloredlogs) only accepts upper case level names
+    level = level.upper() if isinstance(level, str) else level
+    _json_logs = json_format
+
+    if json_format:
+        handler = logging.StreamHandler()
+        handler.setFormatter(JsonLogFormatter())
+        logging.basicConfig(level=level, handlers=[handler])
+    elif sys.stderr.isatty():
+        coloredlogs.install(level=level)
+    else:
+        logging.basicConfig(
+            level=level, format="%(asctime)s %(levelname)s %(name)s %(message)s"
+        )
+
+
+def log_payload(logger: logging.Logger, level: int, msg: str, payload: Any, *args):
+    """Log a JSON-serializable payload along with the message: as a structured
+    field when JSON logs are enabled, or pretty-printed after it otherwise."""
+
+    if not logger.isEnabledFor(level):
+        return
+
+    if _json_logs:
+        logger.log(level, msg, *args, extra={"payload": payload}, stacklevel=2)
+    else:
+        pretty = orjson.dumps(payload, default=str, option=_PRETTY_OPTIONS).decode()
+        logger.log(level, msg + ":\n%s", *args, pretty, stacklevel=2)
+
+
+def install_uvloop() -> bool:
+    """Use the uvloop event loop policy when uvloop is available
+    (it is pulled in by uvicorn[standard] but not on every platform)."""
+
+    try:
+        import uvloop
+    except ImportError:
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
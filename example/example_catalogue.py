@@ -5,13 +5,13 @@ This example shows how the Consumer can list the assets available in the Provide
 import asyncio
 import logging
 import os
-import pprint
-
-import coloredlogs
 
 from edcpy.edc_api import ConnectorController
 
+from _runtime import install_logging, install_uvloop, log_payload
+
 _ENV_LOG_LEVEL = "LOG_LEVEL"
+_ENV_LOG_JSON = "LOG_JSON"
 _ENV_COUNTER_PARTY_PROTOCOL_URL = "COUNTER_PARTY_PROTOCOL_URL"
 
 _logger = logging.getLogger(__name__)
@@ -24,16 +24,22 @@ async def main():
         _ENV_COUNTER_PARTY_PROTOCOL_URL, "http://provider.local:9194/protocol"
     )
 
-    controller = ConnectorController()
-    _logger.debug("Configuration:\n%s", controller.config)
+    async with ConnectorController() as controller:
+        _logger.debug("Configuration:\n%s", controller.config)
 
-    catalog = await controller.fetch_catalog(
-        counter_party_protocol_url=counter_party_protocol_url
-    )
+        catalog = await controller.fetch_catalog(
+            counter_party_protocol_url=counter_party_protocol_url
+        )
 
-    _logger.info("Found datasets:\n%s", pprint.pformat(list(catalog.datasets)))
+    datasets = catalog.datasets
+
+    log_payload(_logger, logging.INFO, "Found %d datasets", datasets, len(datasets))
 
 
 if __name__ == "__main__":
-    coloredlogs.install(level=os.getenv(_ENV_LOG_LEVEL, "DEBUG"))
+    install_logging(
+        level=os.getenv(_ENV_LOG_LEVEL, "INFO"),
+        json_format=os.getenv(_ENV_LOG_JSON, "").lower() in ("1", "true", "yes"),
+    )
+    install_uvloop()
     asyncio.run(main())
@@ -1,18 +1,47 @@
 import asyncio
+import contextlib
 import logging
-import pprint
+from typing import Dict
 
-import coloredlogs
 import environ
 import httpx
+import orjson
 
 from edcpy.edc_api import ConnectorController
-from edcpy.messaging import HttpPullMessage, with_messaging_app
+from edcpy.messaging import (
+    DEFAULT_PREFETCH_COUNT,
+    HttpPullMessage,
+    with_messaging_app,
+)
+
+from _runtime import install_logging, install_uvloop, log_payload
 
 _logger = logging.getLogger(__name__)
 
+# HTTP Pull messages that have been received or are being awaited,
+# indexed by the ID of the transfer process they belong to.
+PendingMessages = Dict[str, "asyncio.Future[dict]"]
+
+# The body of the POST request is passed as a JSON object.
+# Previous knowledge of the request body schema is required.
+# It is serialized once instead of on every request.
+_POST_BODY = {
+    "date_from": "2023-06-15T14:30:00",
+    "date_to": "2023-06-15T18:00:00",
+    "location": "Asturias",
+}
+
+_POST_BODY_JSON = orjson.dumps(_POST_BODY)
+
+# Messages that are not claimed by any transfer (e.g. those that arrive after
+# their transfer timed out) are discarded after this many seconds.
+_UNCLAIMED_MESSAGE_TTL_SECS = 60
+# Upper bound on the number of unclaimed messages kept at any given time;
+# the oldest ones are dropped first when it is exceeded.
+_MAX_UNCLAIMED_MESSAGES = 256
 
-@environ.config(prefix="")
+
+@environ.config(prefix="", frozen=True)
 class AppConfig:
     counter_party_protocol_url: str = environ.var(
         default="http://provider.local:9194/protocol"
@@ -22,123 +51,255 @@ class AppConfig:
     asset_query_get: str = environ.var(default="GET-consumption")
     asset_query_post: str = environ.var(default="POST-consumption-prediction")
     queue_timeout_seconds: int = environ.var(default=20, converter=int)
-    log_level: str = environ.var(default="DEBUG")
+    catalog_ttl_seconds: int = environ.var(default=30, converter=int)
+    queue_prefetch: int = environ.var(default=DEFAULT_PREFETCH_COUNT, converter=int)
+    log_level: str = environ.var(default="INFO")
+    log_json: bool = environ.bool_var(default=False)
+    # HTTP/2 requires the optional h2 package (pip install httpx[http2])
+    http2: bool = environ.bool_var(default=False)
+    # Unix domain socket of a Data Plane running on the same host
+    provider_uds: str = environ.var(default=None)
 
 
-async def pull_handler(message: dict, queue: asyncio.Queue):
-    """Put an HTTP Pull message received from the Rabbit broker into a queue."""
+def get_pending_message(
+    pending: PendingMessages, transfer_process_id: str
+) -> "asyncio.Future[dict]":
+    """Return the future that resolves to the raw HTTP Pull message of the given
+    transfer process, creating it if this is the first time it is referenced."""
 
-    # Using type hints for the message argument seems to break in Python 3.8.
-    message = HttpPullMessage(**message)
+    future = pending.get(transfer_process_id)
 
-    _logger.info(
-        "Putting HTTP Pull request into the queue:\n%s", pprint.pformat(message.dict())
-    )
+    if future is None:
+        future = asyncio.get_running_loop().create_future()
+        pending[transfer_process_id] = future
 
-    # Using a queue is not strictly necessary.
-    # We just need an asyncio-compatible way to pass
-    # the messages from the broker to the main function.
-    await queue.put(message)
+    return future
 
 
-async def request_get(
-    cnf: AppConfig, controller: ConnectorController, queue: asyncio.Queue
+def _discard_unclaimed(
+    pending: PendingMessages,
+    transfer_process_id: str,
+    future: "asyncio.Future[dict]",
 ):
-    """Demonstration of a GET request to the Mock HTTP API."""
+    if pending.get(transfer_process_id) is future:
+        _logger.warning("Discarding unclaimed message (id=%s)", transfer_process_id)
+        del pending[transfer_process_id]
+
+
+def _drop_oldest_unclaimed(pending: PendingMessages):
+    # Resolved futures that are still pending have not been claimed by any
+    # transfer (a transfer removes its future as soon as it is resolved).
+    # Dicts preserve insertion order, so the oldest ones come first.
+    unclaimed = [key for key, future in pending.items() if future.done()]
+
+    for transfer_process_id in unclaimed[:-_MAX_UNCLAIMED_MESSAGES]:
+        _logger.warning("Dropping unclaimed message (id=%s)", transfer_process_id)
+        del pending[transfer_process_id]
+
+
+async def pull_handler(message: dict, pending: PendingMessages):
+    """Resolve the future of the transfer process that an HTTP Pull message
+    received from the Rabbit broker belongs to."""
+
+    # The message is validated by the waiting transfer instead of here
+    # so that the broker consumer is not blocked by Pydantic validation.
+    # The message may arrive before the transfer process ID is known
+    # to the caller, in which case the future is created here.
+    transfer_process_id = message["id"]
+    is_unclaimed = transfer_process_id not in pending
+    future = get_pending_message(pending, transfer_process_id)
+
+    if not future.done():
+        future.set_result(message)
+
+    if is_unclaimed:
+        _drop_oldest_unclaimed(pending)
+
+        asyncio.get_running_loop().call_later(
+            _UNCLAIMED_MESSAGE_TTL_SECS,
+            _discard_unclaimed,
+            pending,
+            transfer_process_id,
+            future,
+        )
+
+
+async def transfer_asset(
+    cnf: AppConfig,
+    controller: ConnectorController,
+    pending: PendingMessages,
+    asset_query: str,
+) -> HttpPullMessage:
+    """Negotiate a contract for the asset and start a transfer process, waiting
+    for the HTTP Pull message that contains the credentials to access it."""
 
     transfer_details = await controller.run_negotiation_flow(
         counter_party_protocol_url=cnf.counter_party_protocol_url,
         counter_party_connector_id=cnf.counter_party_connector_id,
-        asset_query=cnf.asset_query_get,
+        asset_query=asset_query,
     )
 
     transfer_process_id = await controller.run_transfer_flow(
         transfer_details=transfer_details, is_provider_push=False
     )
 
-    http_pull_msg = await asyncio.wait_for(
-        queue.get(), timeout=cnf.queue_timeout_seconds
-    )
-
-    if http_pull_msg.id != transfer_process_id:
-        raise RuntimeError(
-            "The ID of the Transfer Process does not match the ID of the HTTP Pull message"
+    # Messages are matched to transfer processes by ID,
+    # so any number of transfers can be in flight at the same time.
+    try:
+        raw_message = await asyncio.wait_for(
+            get_pending_message(pending, transfer_process_id),
+            timeout=cnf.queue_timeout_seconds,
         )
+    finally:
+        pending.pop(transfer_process_id, None)
+
+    message = HttpPullMessage(**raw_message)
 
-    async with httpx.AsyncClient() as client:
-        _logger.info(
-            "Sending HTTP GET request with arguments:\n%s",
-            pprint.pformat(http_pull_msg.request_args),
+    if _logger.isEnabledFor(logging.INFO):
+        log_payload(
+            _logger, logging.INFO, "Received HTTP Pull request", message.model_dump()
         )
 
-        resp = await client.request(**http_pull_msg.request_args)
-        _logger.info("Response:\n%s", pprint.pformat(resp.json()))
+    return message
 
 
-async def request_post(
-    cnf: AppConfig, controller: ConnectorController, queue: asyncio.Queue
+async def send_request(client: httpx.AsyncClient, request_kwargs: dict):
+    """Send a request to the Provider's Data Plane, only buffering and decoding
+    the response body when it is going to be logged."""
+
+    async with client.stream(**request_kwargs) as resp:
+        if not _logger.isEnabledFor(logging.INFO):
+            # Drain the body so that the connection goes back to the pool
+            async for _ in resp.aiter_raw():
+                pass
+
+            return
+
+        await resp.aread()
+        log_payload(_logger, logging.INFO, "Response", orjson.loads(resp.content))
+
+
+async def request_get(
+    cnf: AppConfig,
+    controller: ConnectorController,
+    pending: PendingMessages,
+    client: httpx.AsyncClient,
 ):
-    """Demonstration of how to call a POST endpoint of the Mock HTTP API passing a JSON body."""
+    """Demonstration of a GET request to the Mock HTTP API."""
 
-    transfer_details = await controller.run_negotiation_flow(
-        counter_party_protocol_url=cnf.counter_party_protocol_url,
-        counter_party_connector_id=cnf.counter_party_connector_id,
-        asset_query=cnf.asset_query_post,
+    http_pull_msg = await transfer_asset(
+        cnf=cnf,
+        controller=controller,
+        pending=pending,
+        asset_query=cnf.asset_query_get,
     )
 
-    transfer_process_id = await controller.run_transfer_flow(
-        transfer_details=transfer_details, is_provider_push=False
-    )
+    # request_args is a property that builds a new dict on every access
+    request_kwargs = http_pull_msg.request_args
 
-    http_pull_msg = await asyncio.wait_for(
-        queue.get(), timeout=cnf.queue_timeout_seconds
+    log_payload(
+        _logger, logging.INFO, "Sending HTTP GET request with arguments", request_kwargs
     )
 
-    if http_pull_msg.id != transfer_process_id:
-        raise RuntimeError(
-            "The ID of the Transfer Process does not match the ID of the HTTP Pull message"
-        )
+    await send_request(client, request_kwargs)
 
-    async with httpx.AsyncClient() as client:
-        # The body of the POST request is passed as a JSON object.
-        # Previous knowledge of the request body schema is required.
-        post_body = {
-            "date_from": "2023-06-15T14:30:00",
-            "date_to": "2023-06-15T18:00:00",
-            "location": "Asturias",
-        }
 
-        request_kwargs = {**http_pull_msg.request_args, "json": post_body}
+async def request_post(
+    cnf: AppConfig,
+    controller: ConnectorController,
+    pending: PendingMessages,
+    client: httpx.AsyncClient,
+):
+    """Demonstration of how to call a POST endpoint of the Mock HTTP API passing a JSON body."""
 
-        _logger.info(
-            "Sending HTTP POST request with arguments:\n%s",
-            pprint.pformat(request_kwargs),
-        )
+    http_pull_msg = await transfer_asset(
+        cnf=cnf,
+        controller=controller,
+        pending=pending,
+        asset_query=cnf.asset_query_post,
+    )
 
-        resp = await client.request(**request_kwargs)
+    # request_args builds a new dict on every access, so it can be extended
+    request_kwargs = http_pull_msg.request_args
+    request_kwargs["headers"]["Content-Type"] = "application/json"
+    request_kwargs["content"] = _POST_BODY_JSON
+
+    if _logger.isEnabledFor(logging.INFO):
+        log_payload(
+            _logger,
+            logging.INFO,
+            "Sending HTTP POST request with arguments",
+            {**request_kwargs, "content": _POST_BODY},
+        )
 
-        _logger.info("Response:\n%s", pprint.pformat(resp.json()))
+    await send_request(client, request_kwargs)
 
 
 async def main(cnf: AppConfig):
-    queue: asyncio.Queue[HttpPullMessage] = asyncio.Queue()
+    pending: PendingMessages = {}
 
     async def pull_handler_partial(message: dict):
-        await pull_handler(message=message, queue=queue)
+        await pull_handler(message=message, pending=pending)
+
+    # A single client is shared by all requests to the Provider's Data Plane
+    # so that connections are kept alive and reused between requests.
+    client_limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    # Fail fast when connecting or waiting for a pooled connection,
+    # while allowing reads and writes to take longer on large bodies.
+    client_timeout = httpx.Timeout(30.0, connect=5.0, pool=5.0)
+
+    # The client ignores its own limits and http2 arguments
+    # when given a transport, so they are passed to the transport too.
+    client_transport = (
+        httpx.AsyncHTTPTransport(
+            uds=cnf.provider_uds, limits=client_limits, http2=cnf.http2
+        )
+        if cnf.provider_uds
+        else None
+    )
+
+    async with contextlib.AsyncExitStack() as stack:
+        # Start the Rabbit broker and set the handler for the HTTP pull messages
+        # (EndpointDataReference) received on the Consumer Backend from the Provider.
+        await stack.enter_async_context(
+            with_messaging_app(
+                http_pull_handler=pull_handler_partial,
+                prefetch_count=cnf.queue_prefetch,
+            )
+        )
 
-    # Start the Rabbit broker and set the handler for the HTTP pull messages
-    # (EndpointDataReference) received on the Consumer Backend from the Provider.
-    async with with_messaging_app(http_pull_handler=pull_handler_partial):
-        controller = ConnectorController()
+        # The GET and POST flows query the same catalogue
+        controller = await stack.enter_async_context(
+            ConnectorController(catalog_ttl_secs=cnf.catalog_ttl_seconds)
+        )
         _logger.debug("Configuration:\n%s", controller.config)
 
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(
+                limits=client_limits,
+                timeout=client_timeout,
+                http2=cnf.http2,
+                transport=client_transport,
+            )
+        )
+
+        request_kwargs = {
+            "cnf": cnf,
+            "controller": controller,
+            "pending": pending,
+            "client": client,
+        }
+
         # Note that the "Mock Backend" HTTP API is a regular HTTP API
         # that does not implement any data space-specific logic.
-        await request_get(cnf=cnf, controller=controller, queue=queue)
-        await request_post(cnf=cnf, controller=controller, queue=queue)
+        # Both flows are independent and can thus run concurrently.
+        await asyncio.gather(
+            request_get(**request_kwargs), request_post(**request_kwargs)
+        )
 
 
 if __name__ == "__main__":
     config: AppConfig = AppConfig.from_environ()
-    coloredlogs.install(level=config.log_level)
+    install_logging(level=config.log_level, json_format=config.log_json)
+    install_uvloop()
     asyncio.run(main(cnf=config))
@@ -1,17 +1,21 @@
 import asyncio
 import logging
-import pprint
 
-import coloredlogs
 import environ
 
 from edcpy.edc_api import ConnectorController
-from edcpy.messaging import HttpPullMessage, HttpPushMessage, with_messaging_app
+from edcpy.messaging import (
+    DEFAULT_PREFETCH_COUNT,
+    HttpPushMessage,
+    with_messaging_app,
+)
+
+from _runtime import install_logging, install_uvloop, log_payload
 
 _logger = logging.getLogger(__name__)
 
 
-@environ.config(prefix="")
+@environ.config(prefix="", frozen=True)
 class AppConfig:
     counter_party_protocol_url: str = environ.var(
         default="http://provider.local:9194/protocol"
@@ -20,7 +24,9 @@ class AppConfig:
     counter_party_connector_id: str = environ.var(default="example-provider")
     asset_query: str = environ.var(default="GET-consumption")
     queue_timeout_seconds: int = environ.var(default=20, converter=int)
-    log_level: str = environ.var(default="DEBUG")
+    queue_prefetch: int = environ.var(default=DEFAULT_PREFETCH_COUNT, converter=int)
+    log_level: str = environ.var(default="INFO")
+    log_json: bool = environ.bool_var(default=False)
     consumer_backend_base_url: str = environ.var(default="http://consumer.local:8000")
     consumer_backend_push_path: str = environ.var(default="/push")
     consumer_backend_push_method: str = environ.var(default="POST")
@@ -30,9 +36,13 @@ async def push_handler(message: dict, queue: asyncio.Queue):
     # Using type hints for the message argument seems to break in Python 3.8.
     message = HttpPushMessage(**message)
 
-    _logger.info(
-        "Putting HTTP Push request into the queue:\n%s", pprint.pformat(message.dict())
-    )
+    if _logger.isEnabledFor(logging.INFO):
+        log_payload(
+            _logger,
+            logging.INFO,
+            "Putting HTTP Push request into the queue",
+            message.model_dump(),
+        )
 
     await queue.put(message)
 
@@ -67,27 +77,31 @@ async def run_request(
         queue.get(), timeout=cnf.queue_timeout_seconds
     )
 
-    _logger.info(
-        "Received response from Mock Backend HTTP API:\n%s",
-        pprint.pformat(http_push_msg.body),
+    log_payload(
+        _logger,
+        logging.INFO,
+        "Received response from Mock Backend HTTP API",
+        http_push_msg.body,
     )
 
 
 async def main(cnf: AppConfig):
-    queue: asyncio.Queue[HttpPullMessage] = asyncio.Queue()
+    queue: "asyncio.Queue[HttpPushMessage]" = asyncio.Queue()
 
     async def push_handler_partial(message: dict):
         await push_handler(message=message, queue=queue)
 
     # Start the Rabbit broker and set the handler for the HTTP pull messages
     # (EndpointDataReference) received on the Consumer Backend from the Provider.
-    async with with_messaging_app(http_push_handler=push_handler_partial):
-        controller = ConnectorController()
+    async with with_messaging_app(
+        http_push_handler=push_handler_partial, prefetch_count=cnf.queue_prefetch
+    ), ConnectorController() as controller:
         _logger.debug("Configuration:\n%s", controller.config)
         await run_request(cnf=cnf, controller=controller, queue=queue)
 
 
 if __name__ == "__main__":
     config: AppConfig = AppConfig.from_environ()
-    coloredlogs.install(level=config.log_level)
+    install_logging(level=config.log_level, json_format=config.log_json)
+    install_uvloop()
     asyncio.run(main(cnf=config))
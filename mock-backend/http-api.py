@@ -1,11 +1,13 @@
 import asyncio
+import functools
+import hmac
 import logging
 import os
 import pprint
 import random
 import uuid
 from datetime import date, datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import arrow
 import coloredlogs
@@ -37,15 +39,23 @@ API_KEY_ENV_VAR = "BACKEND_API_KEY"
 header_scheme = APIKeyHeader(name=API_KEY_HEADER_NAME, auto_error=False)
 
 
+@functools.lru_cache(maxsize=1)
+def _get_expected_api_key() -> Optional[bytes]:
+    """Reads the expected API key once instead of on every request."""
+
+    expected_key = os.getenv(API_KEY_ENV_VAR)
+    return expected_key.encode() if expected_key else None
+
+
 def authenticate_api_key(key: str = Depends(header_scheme)):
     """
     Authenticates API requests by validating the API key provided in the request header.
     Skips authentication if the API key is not set in the environment variable.
     """
 
-    expected_key = os.getenv(API_KEY_ENV_VAR)
+    expected_key = _get_expected_api_key()
 
-    if expected_key and expected_key != key:
+    if expected_key and not hmac.compare_digest(expected_key, (key or "").encode()):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
@@ -170,7 +180,9 @@ async def get_consumption_data(
 async def process_data(api_key: APIKeyAuthDep, request_body: dict):
     """Dummy endpoint that just logs the received data and returns a dummy response."""
 
-    _logger.info("Received POST data:\n%s", pprint.pformat(request_body))
+    if _logger.isEnabledFor(logging.INFO):
+        _logger.info("Received POST data:\n%s", pprint.pformat(request_body))
+
     return {"message": "OK"}
 
 
@@ -67,7 +67,7 @@ class VerifiableCredential:
         }
 
 
-@environ.config(prefix="")
+@environ.config(prefix="", frozen=True)
 class AppConfig:
     issuer_api_base_url = environ.var()
     verifier_api_base_url = environ.var()